@@ -0,0 +1,371 @@
+"""
+Luxeloom Chatbot core
+Intent classification and response templates, free of Flask so the module can
+be compiled ahead of time with mypyc. `python setup.py build_ext --inplace`
+(the Procfile release step) builds chatbot.*.so, which takes precedence over
+chatbot.py on import; without one, the pure-Python module is used unchanged.
+Rebuild after editing this file, or delete the .so to go back to the source,
+since a stale build silently shadows it.
+"""
+import hyperscan
+import orjson
+import re
+import string
+import functools
+import hashlib
+import itertools
+import threading
+from typing import Dict, FrozenSet, Final, Iterator, List, Mapping, Optional, Set, Tuple
+
+# Intent vocabularies. Keywords match whole words, so the inflections customers
+# commonly use ("prices", "ordering", "washing") are listed explicitly.
+GREETING_WORDS = frozenset({"hello", "hi", "hey", "greetings", "good morning", "good afternoon"})
+THANKS_WORDS = frozenset({"thanks", "thank you", "thx", "thankyou", "appreciate"})
+MISSION_WORDS = frozenset({
+    "mission", "missions", "purpose", "about", "story", "edhi", "charity",
+    "donate", "donates", "donated", "donating", "proceeds",
+})
+CARE_WORDS = frozenset({
+    "care", "caring", "wash", "washes", "washing", "washed", "clean", "cleans", "cleaning", "cleaned",
+    "maintain", "maintaining", "instructions",
+})
+ORDER_WORDS = frozenset({
+    "order", "orders", "ordering", "ordered", "buy", "buying", "purchase", "purchases", "purchasing",
+    "price", "prices", "priced", "pricing", "cost", "costs",
+})
+LIST_WORDS = frozenset({"products", "items", "collection", "collections", "what do you have", "show me", "available"})
+
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+
+# Product information database
+PRODUCT_DATA: Final[Mapping[str, Dict[str, str]]] = {
+    "snoopy tote": {
+        "name": "Snoopy Tote",
+        "price": "PKR 2,125",
+        "original_price": "PKR 2,500",
+        "discount": "15% OFF",
+        "description": "Tote bag for all the snoopy lovers ❤️ started out rough but we got there in the end.",
+        "whatsapp": "+92 307 4674619"
+    },
+    "sunny tote": {
+        "name": "Sunny Tote",
+        "price": "PKR 2,125",
+        "original_price": "PKR 2,500",
+        "discount": "15% OFF",
+        "description": "Sunny tote! took ages but worth it because she's literally glowing ☀️",
+        "whatsapp": "+92 307 4674619"
+    },
+    "strawberry miffi tote": {
+        "name": "Strawberry Miffi Tote",
+        "price": "PKR 2,125",
+        "original_price": "PKR 2,500",
+        "discount": "15% OFF",
+        "description": "Watch how this strawberry miffy tote bag came together! love the outcome 🍓",
+        "whatsapp": "+92 307 4674619"
+    },
+    "miffy": {
+        "name": "Strawberry Miffi Tote",
+        "price": "PKR 2,125",
+        "original_price": "PKR 2,500",
+        "discount": "15% OFF",
+        "description": "Watch how this strawberry miffy tote bag came together! love the outcome 🍓",
+        "whatsapp": "+92 307 4674619"
+    }
+}
+_PRODUCT_KEYS = tuple(PRODUCT_DATA)
+
+def _bigrams(text: str) -> FrozenSet[str]:
+    """Set of adjacent character pairs in text"""
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+# Character bigrams of each product key, for fuzzy product matching
+_PRODUCT_BIGRAMS: Final[Mapping[str, FrozenSet[str]]] = {key: _bigrams(key) for key in _PRODUCT_KEYS}
+MIN_BIGRAM_SIMILARITY = 0.25
+
+INTENT_KEYWORDS = (
+    ("greeting", GREETING_WORDS),
+    ("thanks", THANKS_WORDS),
+    ("mission", MISSION_WORDS),
+    ("care", CARE_WORDS),
+    ("order", ORDER_WORDS),
+    ("list", LIST_WORDS),
+)
+
+# Product names and all intent vocabularies compiled into one Hyperscan
+# database, so a single pass over the query finds every intent and any
+# product it names. Expression ids follow the order a regex alternation would
+# try them: products first, so a name containing a keyword matches as the
+# product, then each vocabulary longest word first.
+_MATCH_WORDS: Final[Tuple[Tuple[str, str], ...]] = tuple(
+    (group, word)
+    for group, words in (("product", _PRODUCT_KEYS), *INTENT_KEYWORDS)
+    for word in sorted(words, key=lambda w: (-len(w), w))
+)
+
+def _compile_intent_db() -> hyperscan.Database:
+    """Compile every product name and keyword, on word boundaries, into one database"""
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[rb'\b' + re.escape(word).encode() + rb'\b' for _, word in _MATCH_WORDS],
+        ids=list(range(len(_MATCH_WORDS))),
+        flags=hyperscan.HS_FLAG_SOM_LEFTMOST,
+    )
+    return db
+
+INTENT_DB = _compile_intent_db()
+
+# Concurrent scans cannot share Hyperscan scratch space, so each worker
+# thread allocates its own on first use
+_thread_state = threading.local()
+
+def _scratch() -> hyperscan.Scratch:
+    """Hyperscan scratch space for the calling thread"""
+    scratch = getattr(_thread_state, "scratch", None)
+    if scratch is None:
+        scratch = _thread_state.scratch = hyperscan.Scratch(INTENT_DB)
+    return scratch
+
+def _body_etag(body: bytes) -> str:
+    """Strong ETag for a response body that never changes"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def _build_products_payload() -> bytes:
+    """Serialise the product list once, with duplicates removed by name"""
+    seen = set()
+    unique_products = []
+    for p in PRODUCT_DATA.values():
+        if p['name'] not in seen:
+            seen.add(p['name'])
+            unique_products.append(p)
+    return orjson.dumps({"products": unique_products, "status": "success"})
+
+# Product data never changes, so the /api/products body is built once
+PRODUCTS_PAYLOAD = _build_products_payload()
+PRODUCTS_ETAG = _body_etag(PRODUCTS_PAYLOAD)
+
+# Response templates
+GREETING_RESPONSES = (
+    "Hello! 👋 Welcome to Luxeloom! I'm here to help you with our handmade accessories. What would you like to know?",
+    "Hi there! ✨ I'm your Luxeloom assistant. How can I help you today?",
+    "Welcome to Luxeloom! 🎀 I'm here to assist you with our collection. What can I help you with?",
+    "Hello! 🌸 Ready to explore our handmade accessories? What interests you today?",
+)
+MISSION_RESPONSES = (
+    "At Luxeloom, we believe in shopping with purpose! All proceeds from our handmade accessories support Edhi Foundation, Pakistan's largest welfare organization. When you shop with us, you're making a difference! 💙",
+    "Every purchase you make at Luxeloom directly supports Edhi Foundation! We donate 100% of our profits to help families in need. Shop with your heart! ❤️",
+    "Our mission is simple: beautiful handmade accessories that give back! All profits go to Edhi Foundation to support those in need across Pakistan. 💝",
+)
+CARE_RESPONSES = (
+    "Here's how to care for your Luxeloom tote bags:\n\n• Hand wash in cold water only\n• Use mild detergent; avoid bleach\n• Do not machine wash or tumble dry\n• Air dry flat or hang in the shade (avoid direct sunlight)\n• Iron inside out on low heat if needed\n• The hand-painted design may soften over time, adding to its unique character ✨",
+)
+ORDERING_RESPONSES = (
+    "To place an order, simply message us on WhatsApp at +92 307 4674619! 📱 We'll be happy to help you with your purchase. Thank you for supporting Luxeloom! 💙",
+    "Ready to order? Send us a WhatsApp message at +92 307 4674619 and we'll assist you right away! 🌸",
+)
+THANKS_RESPONSES = (
+    "You're very welcome! Happy to help! 💙",
+    "Anytime! Feel free to ask if you have more questions! ✨",
+    "My pleasure! I'm here whenever you need me! 🌸",
+    "You're welcome! Thanks for choosing Luxeloom! 💝",
+)
+FALLBACK_RESPONSES = (
+    "I'm not sure I understand that. Could you ask about our products, mission, care instructions, or how to order? 😊",
+    "I'm here to help with Luxeloom! Ask me about our products, our mission, care instructions, or ordering! ✨",
+    "Let me help you! I can tell you about our tote bags, our mission, care instructions, or how to place an order! 💙",
+)
+
+RESPONSES: Final[Mapping[str, Tuple[str, ...]]] = {
+    "greeting": GREETING_RESPONSES,
+    "mission": MISSION_RESPONSES,
+    "care": CARE_RESPONSES,
+    "ordering": ORDERING_RESPONSES,
+    "thanks": THANKS_RESPONSES,
+    "fallback": FALLBACK_RESPONSES,
+}
+
+# Product data never changes, so every product reply is rendered once here
+PRODUCT_DETAIL_RESPONSES: Final[Mapping[str, str]] = {
+    key: f"✨ {product['name']} ✨\n\nPrice: {product['price']} (Original: {product['original_price']}) - {product['discount']}\n\n{product['description']}\n\nTo order: WhatsApp +92 307 4674619 📱"
+    for key, product in PRODUCT_DATA.items()
+}
+PRODUCT_ORDER_RESPONSES: Final[Mapping[str, str]] = {
+    key: f"✨ {product['name']} ✨\n\nPrice: {product['price']} (Original: {product['original_price']}) - {product['discount']}\n\n{product['description']}\n\nTo order, WhatsApp us at {product['whatsapp']}! 📱"
+    for key, product in PRODUCT_DATA.items()
+}
+ORDERING_COLLECTION_RESPONSES = tuple(
+    response + "\n\nOur current collection includes:\n• Snoopy Tote - PKR 2,125\n• Sunny Tote - PKR 2,125\n• Strawberry Miffi Tote - PKR 2,125\n\nAll with 15% OFF!"
+    for response in ORDERING_RESPONSES
+)
+COLLECTION_RESPONSE = "🌟 Our Handmade Collection 🌟\n\n1. Snoopy Tote - PKR 2,125 (15% OFF)\n2. Sunny Tote - PKR 2,125 (15% OFF)\n3. Strawberry Miffi Tote - PKR 2,125 (15% OFF)\n\nClick 'View Details' on any product or ask me about a specific one! 💙"
+
+def _reply_etag(reply: str) -> str:
+    """Strong ETag for a fixed reply"""
+    return _body_etag(reply.encode())
+
+# Fixed replies never change, so their ETags are computed once here as well
+PRODUCT_DETAIL_ETAGS: Final[Mapping[str, str]] = {key: _reply_etag(r) for key, r in PRODUCT_DETAIL_RESPONSES.items()}
+PRODUCT_ORDER_ETAGS: Final[Mapping[str, str]] = {key: _reply_etag(r) for key, r in PRODUCT_ORDER_RESPONSES.items()}
+COLLECTION_ETAG = _reply_etag(COLLECTION_RESPONSE)
+_TEMPLATE_ETAGS: Final[Mapping[str, str]] = {
+    intent: _reply_etag(templates[0]) for intent, templates in RESPONSES.items() if len(templates) == 1
+}
+
+# Templates are served round-robin rather than at random. next() on an
+# itertools.cycle runs entirely in C without releasing the GIL, so worker
+# threads can share these iterators without a lock; a free-threaded build
+# would need one. Order replies rotate through _ORDERING_COLLECTION_CYCLE.
+_TEMPLATE_CYCLES: Final[Mapping[str, Iterator[str]]] = {
+    intent: itertools.cycle(templates) for intent, templates in RESPONSES.items() if intent != "ordering"
+}
+_ORDERING_COLLECTION_CYCLE = itertools.cycle(ORDERING_COLLECTION_RESPONSES)
+
+def preprocess_text(text: str) -> str:
+    """Clean and normalize input text"""
+    return text.lower().translate(_PUNCT_TABLE).strip()
+
+def _fuzzy_match_product(query_lower: str) -> Optional[str]:
+    """Return the product key closest to a preprocessed query, if any"""
+    # Rank products by Jaccard similarity of character bigrams
+    query_bigrams = _bigrams(query_lower)
+    best_key = None
+    best_score = 0.0
+    for key, key_bigrams in _PRODUCT_BIGRAMS.items():
+        shared = len(query_bigrams & key_bigrams)
+        score = shared / (len(query_bigrams) + len(key_bigrams) - shared)
+        if score > best_score:
+            best_key, best_score = key, score
+    return best_key if best_score >= MIN_BIGRAM_SIMILARITY else None
+
+# Intents that win over any product mention, in priority order
+_PRIORITY_INTENTS = ("greeting", "thanks", "mission", "care")
+
+def _scan_query(query_proc: str) -> Tuple[FrozenSet[str], Optional[str]]:
+    """Return the intents and the first product named in a preprocessed query"""
+    matches: List[Tuple[int, int, int]] = []
+    
+    def on_match(expr_id: int, start: int, end: int, flags: int, context: object) -> None:
+        matches.append((start, expr_id, end))
+    
+    INTENT_DB.scan(query_proc.encode(), match_event_handler=on_match, scratch=_scratch())
+    
+    # Keep leftmost matches that do not overlap, the lowest id winning at
+    # each offset, as a regex alternation would
+    intents: Set[str] = set()
+    product_key = None
+    scanned_to = 0
+    for start, expr_id, end in sorted(matches):
+        if start < scanned_to:
+            continue
+        scanned_to = end
+        group, word = _MATCH_WORDS[expr_id]
+        intents.add(group)
+        if product_key is None and group == "product":
+            product_key = word
+    return frozenset(intents), product_key
+
+def _needs_fuzzy_match(intents: FrozenSet[str], product_key: Optional[str]) -> bool:
+    """Whether classification depends on a fuzzy product lookup"""
+    return product_key is None and intents.isdisjoint(_PRIORITY_INTENTS)
+
+def _resolve_intent(intents: FrozenSet[str], product_key: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Pick the (intent, product key) pair for a scanned query"""
+    # Greetings, thanks, mission/about and care instructions, in that order
+    for intent in _PRIORITY_INTENTS:
+        if intent in intents:
+            return intent, None
+    
+    # Check for ordering
+    if "order" in intents:
+        return "order", product_key
+    
+    # Check for specific product queries
+    if product_key:
+        return "product", product_key
+    
+    # Check for product listings
+    if "list" in intents:
+        return "list", None
+    
+    return "fallback", None
+
+# Intent classification is deterministic, so repeat queries are cached
+@functools.lru_cache(maxsize=1024)
+def _classify_intent(query_proc: str) -> Tuple[str, Optional[str]]:
+    """Map a preprocessed query to an (intent, product key) pair"""
+    intents, product_key = _scan_query(query_proc)
+    
+    # Fuzzy matching only when no product was named outright
+    if _needs_fuzzy_match(intents, product_key):
+        product_key = _fuzzy_match_product(query_proc)
+    
+    return _resolve_intent(intents, product_key)
+
+# Only short queries are cached, so a few oversized messages cannot pin
+# megabytes of text in the cache
+MAX_CACHED_QUERY_LENGTH = 256
+
+def _classify(query_proc: str) -> Tuple[str, Optional[str]]:
+    """Classify a preprocessed query, through the cache when it is short"""
+    if len(query_proc) > MAX_CACHED_QUERY_LENGTH:
+        return _classify_intent.__wrapped__(query_proc)
+    return _classify_intent(query_proc)
+
+def classification_cache_info() -> "functools._CacheInfo":
+    """Hit/miss statistics of the intent classification cache"""
+    return _classify_intent.cache_info()
+
+def _build_exact_intents() -> Dict[str, Tuple[str, Optional[str]]]:
+    """Classify bare keywords and product names as users commonly type them"""
+    exact = {}
+    for words in (_PRODUCT_KEYS, *(words for _, words in INTENT_KEYWORDS)):
+        for word in words:
+            result = _classify_intent.__wrapped__(word)
+            for variant in (word, word.capitalize(), word.title(), word.upper()):
+                exact[variant] = result
+    return exact
+
+# Fast path for messages that are exactly a keyword ("hi", "Thanks", "PRICE"),
+# which skips preprocessing as well as classification
+_EXACT_INTENTS = _build_exact_intents()
+
+def _render_response(intent: str, product_key: Optional[str]) -> str:
+    """Reply text for a classified query"""
+    if intent == "order":
+        if product_key:
+            return PRODUCT_ORDER_RESPONSES[product_key]
+        else:
+            return next(_ORDERING_COLLECTION_CYCLE)
+    
+    if intent == "product" and product_key:
+        return PRODUCT_DETAIL_RESPONSES[product_key]
+    
+    if intent == "list":
+        return COLLECTION_RESPONSE
+    
+    # Greeting, thanks, mission, care and fallback share template selection
+    return next(_TEMPLATE_CYCLES[intent])
+
+def _response_etag(intent: str, product_key: Optional[str]) -> Optional[str]:
+    """ETag of the reply when a classified query always gets the same one"""
+    if product_key is not None:
+        if intent == "order":
+            return PRODUCT_ORDER_ETAGS[product_key]
+        if intent == "product":
+            return PRODUCT_DETAIL_ETAGS[product_key]
+    if intent == "list":
+        return COLLECTION_ETAG
+    return _TEMPLATE_ETAGS.get(intent)
+
+def respond(query: str) -> Tuple[str, Optional[str]]:
+    """Generate a response, and its ETag if the same query always gets it"""
+    hit = _EXACT_INTENTS.get(query)
+    intent, product_key = hit if hit is not None else _classify(preprocess_text(query))
+    return _render_response(intent, product_key), _response_etag(intent, product_key)
+
+def handle_query(query: str) -> str:
+    """Process user query and generate response"""
+    return respond(query)[0]
+
+def handle_queries(queries: List[str]) -> List[str]:
+    """Process a batch of user queries, returning responses in the same order"""
+    return [handle_query(query) for query in queries]
@@ -0,0 +1,13 @@
+"""
+Build script for the compiled chatbot core
+`python setup.py build_ext --inplace` compiles chatbot.py with mypyc into a
+chatbot.*.so next to it, which app.py then imports in place of the source.
+"""
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="luxeloom-chatbot",
+    py_modules=[],
+    ext_modules=mypycify(["chatbot.py"]),
+)
@@ -0,0 +1,5 @@
+"""
+WSGI entry point for the Luxeloom Chatbot
+Run in production with: gunicorn -w 4 -k gthread --threads 16 wsgi:app
+"""
+from app import app